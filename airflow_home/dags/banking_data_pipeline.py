@@ -8,11 +8,15 @@ from airflow import DAG
 from airflow.operators.python_operator import PythonOperator
 from airflow.operators.bash_operator import BashOperator
 from airflow.hooks.mysql_hook import MySqlHook
+from airflow.utils.trigger_rule import TriggerRule
 import pandas as pd
 import numpy as np
+import pyarrow.dataset as ds
 import logging
+import json
 from typing import Dict, List
 import os
+import tempfile
 
 # DAG Configuration
 default_args = {
@@ -40,6 +44,29 @@ DATA_SOURCE_PATH = "/opt/airflow/data/raw/"
 PROCESSED_PATH = "/opt/airflow/data/processed/"
 MYSQL_CONN_ID = "mysql_default"
 TABLE_NAME = "daily_bank_aggregates"
+INSERT_BATCH_SIZE = 10000  # Rows per executemany round-trip
+TRANSFORM_CHUNK_SIZE = 500_000  # Rows per streamed batch in transform_data
+USE_LOAD_DATA_INFILE = True  # Requires local_infile on the MySQL server and connection
+BANK_IDS = ['BNK001', 'BNK002', 'BNK003', 'BNK004', 'BNK005', 'BNK006', 'BNK007']  # Mock data only
+MYSQL_POOL = "mysql_pool"  # Caps concurrent writers across the mapped load tasks
+
+# Columns written to TABLE_NAME by load_to_mysql, in file/parameter order
+LOAD_COLUMNS = [
+    'bank_id', 'transaction_date', 'total_volume', 'transaction_count',
+    'avg_transaction_value', 'std_transaction_value', 'unique_customers',
+    'transaction_type_breakdown', 'processed_at', 'data_quality_score'
+]
+STAGING_TABLE_NAME = f"{TABLE_NAME}_stg"
+INSERT_SQL = f"""
+INSERT INTO {STAGING_TABLE_NAME} 
+({', '.join(LOAD_COLUMNS)})
+VALUES ({', '.join(['%s'] * len(LOAD_COLUMNS))})
+"""
+MERGE_SQL = f"""
+INSERT INTO {TABLE_NAME} ({', '.join(LOAD_COLUMNS)})
+SELECT {', '.join(LOAD_COLUMNS)} FROM {STAGING_TABLE_NAME} AS stg
+ON DUPLICATE KEY UPDATE {', '.join(f'{TABLE_NAME}.{col} = stg.{col}' for col in LOAD_COLUMNS[2:])}
+"""
 
 def generate_mock_data(**context):
     """
@@ -50,120 +77,178 @@ def generate_mock_data(**context):
     logging.info(f"Generating mock data for {execution_date}")
     
     # Create realistic banking transaction data
-    np.random.seed(42)  # For reproducible results
+    rng = np.random.default_rng(42)  # For reproducible results
     
-    banks = ['BNK001', 'BNK002', 'BNK003', 'BNK004', 'BNK005', 'BNK006', 'BNK007']
+    banks = BANK_IDS
     transaction_types = ['TRANSFER', 'DEPOSIT', 'WITHDRAWAL', 'PAYMENT']
     
-    n_transactions = np.random.randint(1000, 5000)
+    n_transactions = rng.integers(1000, 5000)
     
-    data = {
-        'transaction_id': [f"TXN{str(i).zfill(8)}" for i in range(n_transactions)],
-        'bank_id': np.random.choice(banks, n_transactions),
-        'customer_id': [f"CUST{str(np.random.randint(1000, 9999))}" for _ in range(n_transactions)],
-        'transaction_type': np.random.choice(transaction_types, n_transactions),
-        'amount': np.random.exponential(500, n_transactions).round(2),
-        'transaction_date': execution_date,
-        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
+    # Build identifiers with vectorized string ops instead of per-row f-strings
+    transaction_ids = pd.Series(np.arange(n_transactions)).astype(str).str.zfill(8).radd('TXN')
+    customer_ids = pd.Series(rng.integers(1000, 9999, n_transactions)).astype(str).str.zfill(4).radd('CUST')
+    
+    amount = rng.exponential(500, n_transactions).round(2)
     
     # Introduce some null values and data quality issues
-    null_indices = np.random.choice(n_transactions, size=int(n_transactions * 0.02), replace=False)
-    data['amount'] = list(data['amount'])
-    for idx in null_indices[:len(null_indices)//2]:
-        data['amount'][idx] = None
+    null_indices = rng.choice(n_transactions, size=int(n_transactions * 0.02), replace=False)
+    amount[null_indices[:len(null_indices)//2]] = np.nan
+    
+    data = {
+        'transaction_id': transaction_ids.values,
+        'bank_id': pd.Categorical.from_codes(rng.integers(0, len(banks), n_transactions), categories=banks),
+        'customer_id': customer_ids.values,
+        'transaction_type': pd.Categorical.from_codes(
+            rng.integers(0, len(transaction_types), n_transactions), categories=transaction_types
+        ),
+        'amount': amount,
+        'transaction_date': pd.Timestamp(execution_date),
+        'created_at': pd.Timestamp.now().floor('s')
+    }
     
     df = pd.DataFrame(data)
     
     # Ensure directory exists
     os.makedirs(DATA_SOURCE_PATH, exist_ok=True)
     
-    # Save to CSV
-    file_path = f"{DATA_SOURCE_PATH}transactions_{execution_date}.csv"
-    df.to_csv(file_path, index=False)
+    # Save to Parquet (columnar, keeps dtypes for the downstream tasks)
+    file_path = f"{DATA_SOURCE_PATH}transactions_{execution_date}.parquet"
+    df.to_parquet(file_path, engine='pyarrow', compression='zstd', index=False)
     
     logging.info(f"Generated {len(df)} transactions and saved to {file_path}")
     return file_path
 
+def _validity_masks(df):
+    """
+    Boolean masks of rows with no null critical values, and of rows that also
+    pass the negative-amount and business-rule checks
+    """
+    amount = df['amount']
+    not_null = amount.notna() & df['bank_id'].notna() & df['customer_id'].notna()
+    return not_null, not_null & (amount > 0) & (amount <= 1000000)  # Max 1M per transaction
+
 def ingest_data(**context):
     """
-    Ingest data from CSV file (simulating S3 ingestion)
+    Ingest data from Parquet file (simulating S3 ingestion)
     In production, this would use S3Hook or similar
+    Returns one transform/load partition per bank_id present in the file
     """
     execution_date = context['ds']
-    file_path = f"{DATA_SOURCE_PATH}transactions_{execution_date}.csv"
+    file_path = f"{DATA_SOURCE_PATH}transactions_{execution_date}.parquet"
     
     try:
-        df = pd.read_csv(file_path)
+        df = pd.read_parquet(file_path, engine='pyarrow')
         logging.info(f"Successfully ingested {len(df)} records from {file_path}")
         
         # Store file path in XCom for next task
         context['task_instance'].xcom_push(key='raw_data_path', value=file_path)
         context['task_instance'].xcom_push(key='raw_record_count', value=len(df))
         
-        return file_path
+        # The quality score is a property of the whole day's data, so it is
+        # computed once here rather than per bank partition in transform_data
+        _, valid = _validity_masks(df)
+        data_quality_score = (int(valid.sum()) / len(df)) * 100 if len(df) else 0.0
+        context['task_instance'].xcom_push(key='data_quality_score', value=data_quality_score)
+        
+        # Partition by the banks actually in the day's file, so every bank is
+        # transformed and loaded; the mapped tasks expand over this return value
+        bank_ids = sorted(str(bank_id) for bank_id in df['bank_id'].dropna().unique())
+        logging.info(f"Found {len(bank_ids)} banks to process: {bank_ids}")
+        return [{'bank_id': bank_id} for bank_id in bank_ids]
     except Exception as e:
         logging.error(f"Error ingesting data: {str(e)}")
         raise
 
-def transform_data(**context):
+def _read_bank_chunks(raw_data_path, bank_id):
     """
-    Transform and clean the banking data
+    Yield one bank's raw transactions as DataFrames of at most TRANSFORM_CHUNK_SIZE rows
     """
-    # Get file path from previous task
-    raw_data_path = context['task_instance'].xcom_pull(key='raw_data_path')
-    
-    # Read raw data
-    df = pd.read_csv(raw_data_path)
-    logging.info(f"Starting transformation of {len(df)} records")
+    dataset = ds.dataset(raw_data_path, format='parquet')
+    batches = dataset.to_batches(filter=ds.field('bank_id') == bank_id, batch_size=TRANSFORM_CHUNK_SIZE)
     
-    # Data cleaning and validation
-    initial_count = len(df)
+    has_rows = False
+    for batch in batches:
+        has_rows = True
+        yield batch.to_pandas()
     
-    # 1. Clean null values
-    df = df.dropna(subset=['amount', 'bank_id', 'customer_id'])
-    logging.info(f"Removed {initial_count - len(df)} records with null critical values")
-    
-    # 2. Validate column types
-    df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-    df = df.dropna(subset=['amount'])
-    
-    # Remove negative amounts (invalid transactions)
-    df = df[df['amount'] > 0]
-    
-    # 3. Data type conversions
-    df['transaction_date'] = pd.to_datetime(df['transaction_date'])
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    
-    # 4. Business rule validations
-    # Remove extremely large transactions (potential data errors)
-    df = df[df['amount'] <= 1000000]  # Max 1M per transaction
-    
-    logging.info(f"After cleaning: {len(df)} valid records")
-    
-    # 5. Aggregate daily transaction totals by bank_id
-    daily_aggregates = df.groupby(['bank_id', 'transaction_date']).agg({
-        'amount': ['sum', 'count', 'mean', 'std'],
-        'customer_id': 'nunique',
-        'transaction_type': lambda x: x.value_counts().to_dict()
+    # Keep the column schema flowing downstream when the bank has no rows
+    if not has_rows:
+        yield dataset.schema.empty_table().to_pandas()
+
+def transform_data(bank_id, **context):
+    """
+    Transform and clean the banking data for a single bank partition
+    """
+    # Get file path from previous task
+    raw_data_path = context['task_instance'].xcom_pull(key='raw_data_path')
+    logging.info(f"Starting transformation of {bank_id} records from {raw_data_path}")
+    
+    group_keys = ['bank_id', 'transaction_date']
+    null_count = 0
+    valid_count = 0
+    partial_stats = []
+    partial_customers = []
+    partial_types = []
+    
+    # Stream the partition in bounded chunks; each chunk contributes mergeable
+    # partial aggregates so memory does not grow with the day's volume
+    for df in _read_bank_chunks(raw_data_path, bank_id):
+        # 1-3. Null, negative-amount and business-rule checks share one
+        # boolean mask, so the chunk is sliced once instead of per check
+        not_null, valid = _validity_masks(df)
+        null_count += len(df) - int(not_null.sum())
+        df = df.loc[valid]
+        valid_count += len(df)
+        
+        # 4. Partial aggregates: count, sum and sum of squared deviations (M2)
+        amounts = df.groupby(group_keys, observed=True)['amount']
+        chunk_stats = amounts.agg(['count', 'sum'])
+        chunk_stats['m2'] = amounts.var(ddof=0) * chunk_stats['count']
+        partial_stats.append(chunk_stats)
+        partial_customers.append(df[group_keys + ['customer_id']].drop_duplicates())
+        partial_types.append(df.groupby(group_keys + ['transaction_type'], observed=True).size())
+    
+    logging.info(f"Removed {null_count} records with null critical values")
+    logging.info(f"After cleaning: {valid_count} valid records")
+    
+    # 5. Merge the partials into daily transaction totals by bank_id
+    stats = pd.concat(partial_stats)
+    totals = stats.groupby(level=group_keys, observed=True)[['count', 'sum']].sum()
+    mean = totals['sum'] / totals['count']
+    
+    # Combine per-chunk M2 around the overall mean (parallel variance), which
+    # gives the same sample std as a single pass over all rows
+    shift = stats['sum'] / stats['count'] - mean.reindex(stats.index)
+    m2 = (stats['m2'] + stats['count'] * shift ** 2).groupby(level=group_keys, observed=True).sum()
+    
+    customers = pd.concat(partial_customers).drop_duplicates()
+    daily_aggregates = pd.DataFrame({
+        'total_volume': totals['sum'],
+        'transaction_count': totals['count'],
+        'avg_transaction_value': mean,
+        'std_transaction_value': np.sqrt(m2 / (totals['count'] - 1)).where(totals['count'] > 1),
+        'unique_customers': customers.groupby(group_keys, observed=True).size()
     }).round(2)
     
-    # Flatten column names
-    daily_aggregates.columns = [
-        'total_volume', 'transaction_count', 'avg_transaction_value', 
-        'std_transaction_value', 'unique_customers', 'transaction_type_breakdown'
-    ]
+    # Per-type counts as one wide integer frame, serialized to JSON once per output row
+    type_counts = pd.concat(partial_types).groupby(level=group_keys + ['transaction_type'], observed=True).sum()
+    type_counts = type_counts.unstack('transaction_type', fill_value=0)
+    daily_aggregates['transaction_type_breakdown'] = pd.Series(
+        [json.dumps(counts) for counts in type_counts.to_dict(orient='records')], index=type_counts.index
+    )
     
     daily_aggregates = daily_aggregates.reset_index()
     
     # Add metadata
     daily_aggregates['processed_at'] = datetime.now()
-    daily_aggregates['data_quality_score'] = (len(df) / initial_count) * 100
+    daily_aggregates['data_quality_score'] = context['task_instance'].xcom_pull(
+        task_ids='ingest_data', key='data_quality_score'
+    )
     
     # Save processed data
     os.makedirs(PROCESSED_PATH, exist_ok=True)
-    processed_file = f"{PROCESSED_PATH}daily_aggregates_{context['ds']}.csv"
-    daily_aggregates.to_csv(processed_file, index=False)
+    processed_file = f"{PROCESSED_PATH}daily_aggregates_{context['ds']}_{bank_id}.parquet"
+    daily_aggregates.to_parquet(processed_file, engine='pyarrow', compression='zstd', index=False)
     
     logging.info(f"Transformation complete. Aggregated data saved to {processed_file}")
     
@@ -173,14 +258,18 @@ def transform_data(**context):
     
     return processed_file
 
-def load_to_mysql(**context):
+def load_to_mysql(bank_id, **context):
     """
-    Load transformed data into MySQL database
+    Load one bank's transformed data into MySQL database
     """
-    processed_data_path = context['task_instance'].xcom_pull(key='processed_data_path')
+    # transform_data and load_to_mysql are mapped over the same banks, so indexes line up
+    task_instance = context['task_instance']
+    processed_data_path = task_instance.xcom_pull(
+        task_ids='transform_data', key='processed_data_path', map_indexes=task_instance.map_index
+    )
     
     # Read processed data
-    df = pd.read_csv(processed_data_path)
+    df = pd.read_parquet(processed_data_path, engine='pyarrow')
     
     # Get MySQL connection
     mysql_hook = MySqlHook(mysql_conn_id=MYSQL_CONN_ID)
@@ -196,7 +285,7 @@ def load_to_mysql(**context):
         avg_transaction_value DECIMAL(10,2),
         std_transaction_value DECIMAL(10,2),
         unique_customers INT,
-        transaction_type_breakdown TEXT,
+        transaction_type_breakdown JSON,
         processed_at DATETIME,
         data_quality_score DECIMAL(5,2),
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -207,25 +296,53 @@ def load_to_mysql(**context):
     mysql_hook.run(create_table_sql)
     logging.info(f"Table {TABLE_NAME} created/verified")
     
-    # Insert data (using INSERT IGNORE to handle duplicates)
-    for _, row in df.iterrows():
-        insert_sql = f"""
-        INSERT IGNORE INTO {TABLE_NAME} 
-        (bank_id, transaction_date, total_volume, transaction_count, 
-         avg_transaction_value, std_transaction_value, unique_customers, 
-         transaction_type_breakdown, processed_at, data_quality_score)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+    conn = mysql_hook.get_conn()
+    cursor = conn.cursor()
+    load_file = None
+    try:
+        # Session-scoped staging table with no keys, so the bulk load does no
+        # per-row unique-index checks; concurrent load tasks each get their own
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE_NAME}")
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {STAGING_TABLE_NAME} "
+            f"AS SELECT {', '.join(LOAD_COLUMNS)} FROM {TABLE_NAME} WHERE 1 = 0"
+        )
+        
+        if USE_LOAD_DATA_INFILE:
+            # Stream a CSV straight into staging, skipping per-row SQL parsing; the
+            # file is temporary and removed once the load is done
+            with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as load_csv:
+                load_file = load_csv.name
+                df[LOAD_COLUMNS].assign(transaction_date=df['transaction_date'].dt.date).to_csv(
+                    load_csv, index=False, header=False, na_rep='\\N', lineterminator='\n'
+                )
+            cursor.execute(f"""
+            LOAD DATA LOCAL INFILE '{load_file}'
+            INTO TABLE {STAGING_TABLE_NAME}
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\n'
+            ({', '.join(LOAD_COLUMNS)})
+            """)
+        else:
+            # Insert data into staging in batches
+            # NaN (e.g. std of a single-transaction day) must be sent as SQL NULL
+            rows_df = df[LOAD_COLUMNS].astype(object).where(df[LOAD_COLUMNS].notna(), None)
+            rows = list(rows_df.itertuples(index=False, name=None))
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                cursor.executemany(INSERT_SQL, rows[start:start + INSERT_BATCH_SIZE])
         
-        mysql_hook.run(insert_sql, parameters=(
-            row['bank_id'], row['transaction_date'], row['total_volume'],
-            row['transaction_count'], row['avg_transaction_value'],
-            row['std_transaction_value'], row['unique_customers'],
-            str(row['transaction_type_breakdown']), row['processed_at'],
-            row['data_quality_score']
-        ))
-    
-    logging.info(f"Successfully loaded {len(df)} records into {TABLE_NAME}")
+        # Merge into the target in one statement, so unique-key maintenance
+        # happens once per batch; reruns update the existing bank/date rows
+        cursor.execute(MERGE_SQL)
+        cursor.execute(f"DROP TEMPORARY TABLE {STAGING_TABLE_NAME}")
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+        if load_file is not None:
+            os.remove(load_file)
+    
+    logging.info(f"Successfully loaded {len(df)} {bank_id} records into {TABLE_NAME}")
 
 def data_quality_check(**context):
     """
@@ -275,21 +392,25 @@ ingest_task = PythonOperator(
     dag=dag
 )
 
-transform_task = PythonOperator(
+# Transform and load are mapped over the banks found by ingest_data, so the
+# partitions run in parallel
+transform_task = PythonOperator.partial(
     task_id='transform_data',
     python_callable=transform_data,
     dag=dag
-)
+).expand(op_kwargs=ingest_task.output)
 
-load_task = PythonOperator(
+load_task = PythonOperator.partial(
     task_id='load_to_mysql',
     python_callable=load_to_mysql,
+    pool=MYSQL_POOL,
     dag=dag
-)
+).expand(op_kwargs=ingest_task.output)
 
 quality_check_task = PythonOperator(
     task_id='data_quality_check',
     python_callable=data_quality_check,
+    trigger_rule=TriggerRule.ALL_DONE,
     dag=dag
 )
 
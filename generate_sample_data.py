@@ -5,16 +5,28 @@ EFT Banking Pipeline Analytics
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from datetime import datetime, timedelta
-import random
 import json
 
+# Volume multipliers indexed by weekday (0=Monday): higher on Fridays, lower on weekends
+DAY_MULTIPLIERS = np.array([1.0, 1.0, 1.0, 1.0, 1.2, 0.6, 0.3])
+
+# Volume multipliers indexed by month (index 0 unused): post-holiday January,
+# mid-year slowdown in June-August and holiday season in November-December
+SEASONAL_MULTIPLIERS = np.array([1.0, 0.8, 1.0, 1.0, 1.0, 1.0, 0.9, 0.9, 0.9, 1.0, 1.0, 1.3, 1.3])
+
+# Root seed for reproducible samples. Each generator draws from its own child
+# stream of it, so their random values are independent of one another
+SEED = 42
+BANKING_DATA_STREAM, CUSTOMER_DATA_STREAM = np.random.SeedSequence(SEED).spawn(2)
+
 def generate_comprehensive_banking_data(days_back=180, base_daily_volume=50000):
     """
     Generate comprehensive banking data for PowerBI dashboard
     """
-    np.random.seed(42)
-    random.seed(42)
+    rng = np.random.default_rng(BANKING_DATA_STREAM)
     
     # Bank configuration with realistic profiles
     banks = {
@@ -32,198 +44,185 @@ def generate_comprehensive_banking_data(days_back=180, base_daily_volume=50000):
     start_date = end_date - timedelta(days=days_back)
     date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    all_data = []
+    # Per-date factors and calendar columns, computed once for the whole range
+    # rather than once per (date, bank) row
+    day_of_week = date_range.dayofweek.to_numpy(dtype=np.int64)
+    month = date_range.month.to_numpy(dtype=np.int64)
+    dates_df = pd.DataFrame({
+        'transaction_date': date_range.strftime('%Y-%m-%d'),
+        'day_of_week': day_of_week + 1,  # 1=Monday, 7=Sunday
+        'day_name': date_range.day_name(),
+        'month': month,
+        'month_name': date_range.month_name(),
+        'quarter': np.char.add('Q', ((month - 1) // 3 + 1).astype(str)),
+        'year': date_range.year.to_numpy(dtype=np.int64),
+        'week_number': date_range.isocalendar()['week'].to_numpy(dtype=np.int64),
+        'is_weekend': day_of_week >= 5,
+        'day_multiplier': DAY_MULTIPLIERS[day_of_week],
+        'seasonal_multiplier': SEASONAL_MULTIPLIERS[month],
+        # Add some random events (5% chance of a crisis or boom per day)
+        'event_multiplier': np.where(
+            rng.random(len(date_range)) < 0.05,
+            rng.choice([0.4, 0.5, 1.8, 2.2], len(date_range)),
+            1.0
+        )
+    })
+    
+    # Per-bank factors, including the transaction type mix
+    banks_df = pd.DataFrame.from_dict(banks, orient='index').rename_axis('bank_id').reset_index()
+    banks_df = banks_df.rename(columns={'name': 'bank_name'})
+    is_digital = banks_df['bank_name'].str.contains('Digital')
+    is_heritage = banks_df['bank_name'].str.contains('Heritage')
+    banks_df['transfer_share'] = 0.35 - 0.1 * is_digital
+    banks_df['deposit_share'] = 0.25 + 0.1 * is_heritage
+    banks_df['withdrawal_share'] = 0.20
+    banks_df['payment_share'] = 0.20 + 0.1 * is_digital - 0.1 * is_heritage
+    
+    # One row per (date, bank), date-major like the dashboard expects
+    merged = dates_df.merge(banks_df, how='cross')
+    n_rows = len(merged)
+    size_multiplier = merged['size_multiplier'].to_numpy(dtype=np.float64)
+    volatility = merged['volatility'].to_numpy(dtype=np.float64)
+    
+    # Apply all multipliers
+    base_volume = base_daily_volume * size_multiplier
+    daily_base = (base_volume * merged['day_multiplier'].to_numpy(dtype=np.float64) *
+                  merged['seasonal_multiplier'].to_numpy(dtype=np.float64) *
+                  merged['event_multiplier'].to_numpy(dtype=np.float64))
+    
+    # Add random variation with a minimum floor
+    daily_volume = daily_base * (1 + rng.normal(0, volatility))
+    daily_volume = np.maximum(daily_volume, base_volume * 0.1)
+    
+    # Calculate other metrics
+    transaction_count = (daily_volume / rng.uniform(80, 150, n_rows)).astype(np.int32)
+    avg_transaction = np.divide(daily_volume, transaction_count,
+                                out=np.zeros(n_rows), where=transaction_count > 0)
+    
+    # Customer metrics
+    unique_customers = (transaction_count * rng.uniform(0.6, 0.9, n_rows)).astype(np.int32)
+    avg_value_per_customer = np.divide(daily_volume, unique_customers,
+                                       out=np.zeros(n_rows), where=unique_customers > 0)
+    
+    # Data quality (10% chance of quality issues)
+    data_quality_score = np.where(
+        rng.random(n_rows) < 0.1,
+        rng.uniform(75, 92, n_rows),
+        rng.uniform(92, 100, n_rows)
+    )
     
-    for date in date_range:
-        day_of_week = date.dayofweek
-        month = date.month
-        
-        # Day of week effect (lower on weekends)
-        day_multiplier = 1.0
-        if day_of_week == 5:  # Saturday
-            day_multiplier = 0.6
-        elif day_of_week == 6:  # Sunday
-            day_multiplier = 0.3
-        elif day_of_week == 4:  # Friday
-            day_multiplier = 1.2
-        
-        # Seasonal effects
-        seasonal_multiplier = 1.0
-        if month in [11, 12]:  # Holiday season
-            seasonal_multiplier = 1.3
-        elif month in [6, 7, 8]:  # Mid Year
-            seasonal_multiplier = 0.9
-        elif month == 1:  # January (post-holiday)
-            seasonal_multiplier = 0.8
-        
-        # Add some random events (market volatility)
-        event_multiplier = 1.0
-        if random.random() < 0.05:  # 5% chance of significant event
-            event_multiplier = random.choice([0.4, 0.5, 1.8, 2.2])  # Crisis or boom
-        
-        for bank_id, bank_info in banks.items():
-            base_volume = base_daily_volume * bank_info['size_multiplier']
-            volatility = bank_info['volatility']
-            
-            # Apply all multipliers
-            daily_base = base_volume * day_multiplier * seasonal_multiplier * event_multiplier
-            
-            # Add random variation
-            daily_volume = daily_base * (1 + np.random.normal(0, volatility))
-            daily_volume = max(daily_volume, base_volume * 0.1)  # Minimum floor
-            
-            # Calculate other metrics
-            transaction_count = int(daily_volume / np.random.uniform(80, 150))
-            avg_transaction = daily_volume / transaction_count if transaction_count > 0 else 0
-            
-            # Customer metrics
-            unique_customers = int(transaction_count * np.random.uniform(0.6, 0.9))
-            avg_value_per_customer = daily_volume / unique_customers if unique_customers > 0 else 0
-            
-            # Data quality (occasional issues)
-            data_quality_score = np.random.uniform(92, 100)
-            if random.random() < 0.1:  # 10% chance of quality issues
-                data_quality_score = np.random.uniform(75, 92)
-            
-            # Transaction type breakdown
-            type_distribution = {
-                'TRANSFER': 0.35,
-                'DEPOSIT': 0.25,
-                'WITHDRAWAL': 0.20,
-                'PAYMENT': 0.20
-            }
-            
-            # Add some variation to transaction types by bank
-            if 'Digital' in bank_info['name']:
-                type_distribution['PAYMENT'] += 0.1
-                type_distribution['TRANSFER'] -= 0.1
-            elif 'Heritage' in bank_info['name']:
-                type_distribution['DEPOSIT'] += 0.1
-                type_distribution['PAYMENT'] -= 0.1
-            
-            all_data.append({
-                'transaction_date': date.strftime('%Y-%m-%d'),
-                'bank_id': bank_id,
-                'bank_name': bank_info['name'],
-                'total_volume': round(daily_volume, 2),
-                'transaction_count': transaction_count,
-                'avg_transaction_value': round(avg_transaction, 2),
-                'unique_customers': unique_customers,
-                'avg_value_per_customer': round(avg_value_per_customer, 2),
-                'data_quality_score': round(data_quality_score, 1),
-                'day_of_week': day_of_week + 1,  # 1=Monday, 7=Sunday
-                'day_name': date.strftime('%A'),
-                'month': month,
-                'month_name': date.strftime('%B'),
-                'quarter': f'Q{((month-1)//3)+1}',
-                'year': date.year,
-                'week_number': date.isocalendar()[1],
-                'is_weekend': day_of_week >= 5,
-                'transfer_volume': round(daily_volume * type_distribution['TRANSFER'], 2),
-                'deposit_volume': round(daily_volume * type_distribution['DEPOSIT'], 2),
-                'withdrawal_volume': round(daily_volume * type_distribution['WITHDRAWAL'], 2),
-                'payment_volume': round(daily_volume * type_distribution['PAYMENT'], 2),
-                'volatility_score': round(volatility * 100, 1),
-                'market_segment': 'Large' if bank_info['size_multiplier'] > 1.5 else 'Medium' if bank_info['size_multiplier'] > 1.0 else 'Small'
-            })
-    
-    return pd.DataFrame(all_data)
+    # Assemble from plain arrays so the constructor does no index alignment
+    return pd.DataFrame({
+        'transaction_date': merged['transaction_date'].to_numpy(),
+        'bank_id': merged['bank_id'].to_numpy(),
+        'bank_name': merged['bank_name'].to_numpy(),
+        'total_volume': daily_volume.round(2),
+        'transaction_count': transaction_count,
+        'avg_transaction_value': avg_transaction.round(2),
+        'unique_customers': unique_customers,
+        'avg_value_per_customer': avg_value_per_customer.round(2),
+        'data_quality_score': data_quality_score.round(1),
+        'day_of_week': merged['day_of_week'].to_numpy(),
+        'day_name': merged['day_name'].to_numpy(),
+        'month': merged['month'].to_numpy(),
+        'month_name': merged['month_name'].to_numpy(),
+        'quarter': merged['quarter'].to_numpy(),
+        'year': merged['year'].to_numpy(),
+        'week_number': merged['week_number'].to_numpy(),
+        'is_weekend': merged['is_weekend'].to_numpy(),
+        'transfer_volume': (daily_volume * merged['transfer_share'].to_numpy(dtype=np.float64)).round(2),
+        'deposit_volume': (daily_volume * merged['deposit_share'].to_numpy(dtype=np.float64)).round(2),
+        'withdrawal_volume': (daily_volume * merged['withdrawal_share'].to_numpy(dtype=np.float64)).round(2),
+        'payment_volume': (daily_volume * merged['payment_share'].to_numpy(dtype=np.float64)).round(2),
+        'volatility_score': (volatility * 100).round(1),
+        'market_segment': np.select(
+            [size_multiplier > 1.5, size_multiplier > 1.0],
+            ['Large', 'Medium'], default='Small'
+        )
+    })
 
-def generate_anomaly_data():
+def generate_anomaly_data(df=None):
     """
     Generate anomaly detection sample data
     """
-    # Get the main dataset
-    df = generate_comprehensive_banking_data()
+    # Get the main dataset unless the caller already has it
+    if df is None:
+        df = generate_comprehensive_banking_data()
     
     # Calculate anomaly thresholds
-    df['volume_7day_avg'] = df.groupby('bank_id')['total_volume'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).mean()
+    # Grouped rolling windows run natively per bank instead of via a lambda
+    rolling_volume = df.groupby('bank_id')['total_volume'].rolling(window=7, min_periods=1)
+    volume_7day_avg = rolling_volume.mean().reset_index(level=0, drop=True)
+    volume_7day_std = rolling_volume.std().reset_index(level=0, drop=True)
+    
+    # Classify all rows in one vectorized pass over the deviation scores
+    z_score = (df['total_volume'] - volume_7day_avg) / volume_7day_std.fillna(1)
+    conditions = [z_score > 2.5, z_score > 1.5, z_score < -2.5, z_score < -1.5]
+    choices = ['High Anomaly', 'Moderate Anomaly', 'Low Anomaly', 'Below Normal']
+    anomaly_status = pd.Series(np.select(conditions, choices, default='Normal'), index=df.index)
+    
+    # Days without a usable rolling deviation are always considered normal
+    no_deviation = volume_7day_std.isna() | (volume_7day_std == 0)
+    anomaly_status[no_deviation] = 'Normal'
+    
+    # assign() leaves the caller's frame untouched
+    return df.assign(
+        volume_7day_avg=volume_7day_avg,
+        volume_7day_std=volume_7day_std,
+        anomaly_status=anomaly_status,
+        z_score=z_score.abs()
     )
-    df['volume_7day_std'] = df.groupby('bank_id')['total_volume'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).std()
-    )
-    
-    # Define anomaly status
-    def classify_anomaly(row):
-        if pd.isna(row['volume_7day_std']) or row['volume_7day_std'] == 0:
-            return 'Normal'
-        
-        z_score = abs(row['total_volume'] - row['volume_7day_avg']) / row['volume_7day_std']
-        
-        if z_score > 2.5:
-            return 'High Anomaly'
-        elif z_score > 1.5:
-            return 'Moderate Anomaly'
-        elif z_score < -2.5:
-            return 'Low Anomaly'
-        elif z_score < -1.5:
-            return 'Below Normal'
-        else:
-            return 'Normal'
-    
-    df['anomaly_status'] = df.apply(classify_anomaly, axis=1)
-    df['z_score'] = abs(df['total_volume'] - df['volume_7day_avg']) / df['volume_7day_std'].fillna(1)
-    
-    return df
 
-def generate_customer_analysis_data():
+def generate_customer_analysis_data(df=None):
     """
     Generate customer-centric analysis data
     """
-    df = generate_comprehensive_banking_data()
-    
-    # Monthly customer analysis
-    monthly_data = []
-    
-    for _, row in df.iterrows():
-        # Generate customer segments
-        high_value_customers = int(row['unique_customers'] * 0.15)
-        medium_value_customers = int(row['unique_customers'] * 0.35)
-        regular_customers = row['unique_customers'] - high_value_customers - medium_value_customers
-        
-        # Value distribution
-        high_value_volume = row['total_volume'] * 0.6
-        medium_value_volume = row['total_volume'] * 0.25
-        regular_value_volume = row['total_volume'] * 0.15
-        
-        monthly_data.append({
-            'transaction_date': row['transaction_date'],
-            'bank_id': row['bank_id'],
-            'bank_name': row['bank_name'],
-            'high_value_customers': high_value_customers,
-            'medium_value_customers': medium_value_customers,
-            'regular_customers': regular_customers,
-            'high_value_volume': round(high_value_volume, 2),
-            'medium_value_volume': round(medium_value_volume, 2),
-            'regular_value_volume': round(regular_value_volume, 2),
-            'avg_high_value': round(high_value_volume / high_value_customers if high_value_customers > 0 else 0, 2),
-            'avg_medium_value': round(medium_value_volume / medium_value_customers if medium_value_customers > 0 else 0, 2),
-            'avg_regular_value': round(regular_value_volume / regular_customers if regular_customers > 0 else 0, 2),
-            'customer_retention_rate': round(np.random.uniform(85, 98), 1),
-            'new_customers': int(row['unique_customers'] * np.random.uniform(0.05, 0.15))
-        })
-    
-    return pd.DataFrame(monthly_data)
+    if df is None:
+        df = generate_comprehensive_banking_data()
+    
+    rng = np.random.default_rng(CUSTOMER_DATA_STREAM)
+    
+    n_rows = len(df)
+    
+    # Customer segments derived column-wise from the daily aggregates
+    unique_customers = df['unique_customers'].to_numpy(dtype=np.int32)
+    high_value_customers = (unique_customers * 0.15).astype(np.int32)
+    medium_value_customers = (unique_customers * 0.35).astype(np.int32)
+    regular_customers = unique_customers - high_value_customers - medium_value_customers
+    
+    # Value distribution
+    total_volume = df['total_volume'].to_numpy(dtype=np.float64)
+    high_value_volume = total_volume * 0.6
+    medium_value_volume = total_volume * 0.25
+    regular_value_volume = total_volume * 0.15
+    
+    monthly_data = pd.DataFrame({
+        'transaction_date': df['transaction_date'].to_numpy(),
+        'bank_id': df['bank_id'].to_numpy(),
+        'bank_name': df['bank_name'].to_numpy(),
+        'high_value_customers': high_value_customers,
+        'medium_value_customers': medium_value_customers,
+        'regular_customers': regular_customers,
+        'high_value_volume': high_value_volume.round(2),
+        'medium_value_volume': medium_value_volume.round(2),
+        'regular_value_volume': regular_value_volume.round(2),
+        'avg_high_value': np.divide(high_value_volume, high_value_customers,
+                                    out=np.zeros(n_rows), where=high_value_customers > 0).round(2),
+        'avg_medium_value': np.divide(medium_value_volume, medium_value_customers,
+                                      out=np.zeros(n_rows), where=medium_value_customers > 0).round(2),
+        'avg_regular_value': np.divide(regular_value_volume, regular_customers,
+                                       out=np.zeros(n_rows), where=regular_customers > 0).round(2),
+        'customer_retention_rate': rng.uniform(85, 98, n_rows).round(1),
+        'new_customers': (unique_customers * rng.uniform(0.05, 0.15, n_rows)).astype(np.int32)
+    })
+    
+    return monthly_data
 
-def create_powerbi_datasets():
+def generate_bank_summary(df):
     """
-    Create all datasets needed for PowerBI dashboard
+    Summarize lifetime performance per bank
     """
-    print("Generating comprehensive banking data...")
-    main_data = generate_comprehensive_banking_data()
-    
-    print("Generating anomaly detection data...")
-    anomaly_data = generate_anomaly_data()
-    
-    print("Generating customer analysis data...")
-    customer_data = generate_customer_analysis_data()
-    
-    # Create summary tables for PowerBI
-    print("Creating summary tables...")
-    
-    # Bank summary
-    bank_summary = main_data.groupby(['bank_id', 'bank_name', 'market_segment']).agg({
+    bank_summary = df.groupby(['bank_id', 'bank_name', 'market_segment']).agg({
         'total_volume': ['sum', 'mean', 'std'],
         'transaction_count': 'sum',
         'unique_customers': 'sum',
@@ -232,10 +231,13 @@ def create_powerbi_datasets():
     
     bank_summary.columns = ['total_lifetime_volume', 'avg_daily_volume', 'volume_volatility', 
                            'total_transactions', 'total_customers', 'avg_data_quality']
-    bank_summary = bank_summary.reset_index()
-    
-    # Monthly trends
-    monthly_summary = main_data.groupby(['year', 'month', 'month_name']).agg({
+    return bank_summary.reset_index()
+
+def generate_monthly_trends(df):
+    """
+    Summarize volume and activity per month
+    """
+    monthly_summary = df.groupby(['year', 'month', 'month_name']).agg({
         'total_volume': 'sum',
         'transaction_count': 'sum',
         'unique_customers': 'sum',
@@ -243,25 +245,37 @@ def create_powerbi_datasets():
     }).round(2)
     
     monthly_summary.columns = ['monthly_volume', 'monthly_transactions', 'monthly_customers', 'active_banks']
-    monthly_summary = monthly_summary.reset_index()
-    
-    # Weekly patterns
-    weekly_patterns = main_data.groupby(['day_name', 'day_of_week', 'is_weekend']).agg({
+    return monthly_summary.reset_index()
+
+def generate_weekly_patterns(df):
+    """
+    Summarize average activity per day of week
+    """
+    weekly_patterns = df.groupby(['day_name', 'day_of_week', 'is_weekend']).agg({
         'total_volume': 'mean',
         'transaction_count': 'mean',
         'unique_customers': 'mean'
     }).round(2)
     
     weekly_patterns.columns = ['avg_daily_volume', 'avg_daily_transactions', 'avg_daily_customers']
-    weekly_patterns = weekly_patterns.reset_index()
+    return weekly_patterns.reset_index()
+
+def create_powerbi_datasets():
+    """
+    Create all datasets needed for PowerBI dashboard
+    """
+    print("Generating comprehensive banking data...")
+    main_data = generate_comprehensive_banking_data()
     
+    # The derived datasets are all built from the one main_data frame
+    print("Generating anomaly, customer and summary datasets...")
     return {
         'daily_transactions': main_data,
-        'anomaly_analysis': anomaly_data,
-        'customer_analysis': customer_data,
-        'bank_summary': bank_summary,
-        'monthly_trends': monthly_summary,
-        'weekly_patterns': weekly_patterns
+        'anomaly_analysis': generate_anomaly_data(main_data),
+        'customer_analysis': generate_customer_analysis_data(main_data),
+        'bank_summary': generate_bank_summary(main_data),
+        'monthly_trends': generate_monthly_trends(main_data),
+        'weekly_patterns': generate_weekly_patterns(main_data)
     }
 
 def save_datasets_for_powerbi(output_dir='./powerbi_data/'):
@@ -275,7 +289,8 @@ def save_datasets_for_powerbi(output_dir='./powerbi_data/'):
     
     for dataset_name, df in datasets.items():
         file_path = f"{output_dir}{dataset_name}.csv"
-        df.to_csv(file_path, index=False)
+        # Arrow's multithreaded C++ writer instead of pandas' per-cell formatting
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), file_path)
         print(f"Saved {len(df)} records to {file_path}")
     
     # Create metadata file
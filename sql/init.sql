@@ -44,7 +44,7 @@ CREATE TABLE IF NOT EXISTS daily_bank_aggregates (
     max_transaction_value DECIMAL(10,2),
     unique_customers INT,
     unique_transaction_ids INT,
-    transaction_type_breakdown TEXT,
+    transaction_type_breakdown JSON,
     avg_transactions_per_customer DECIMAL(8,2),
     avg_value_per_customer DECIMAL(12,2),
     processed_at DATETIME,
@@ -420,7 +420,7 @@ CREATE TABLE IF NOT EXISTS daily_bank_aggregates (
     max_transaction_value DECIMAL(10,2),
     unique_customers INT,
     unique_transaction_ids INT,
-    transaction_type_breakdown TEXT,
+    transaction_type_breakdown JSON,
     avg_transactions_per_customer DECIMAL(8,2),
     avg_value_per_customer DECIMAL(12,2),
     processed_at DATETIME,